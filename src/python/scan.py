@@ -1,42 +1,94 @@
 #!/usr/bin/env python3
 
+import argparse
+import concurrent.futures
+import logging
 import math
 import multiprocessing
-import multiprocessing.pool
-import random
-import re
 import sys
 import timeit
-
-# Daemon processes are important for parallel processing and improving computational
-# performance of this script.
-
-class NoDaemonProcess(multiprocessing.Process):
-    """ 
-    Define a no-daemon process (NoDaemonProcess) class so we can have processes spawned 
-    by a pool that can also spawn their own subprocesses
+from dataclasses import dataclass, field
+from fractions import Fraction
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+try:
+    import numba
+    _NUMBA_AVAILABLE = True
+    _prange = numba.prange
+except ImportError:
+    _NUMBA_AVAILABLE = False
+    _prange = range
+
+logger = logging.getLogger(__name__)
+
+# 'C' (0x43) and 'G' (0x47) differ only in bit 2, so they are the only two bytes
+# that equal `_CG_MATCH` once that bit is set. This matches both with a single
+# comparison per byte.
+_CG_BIT = ord('C') ^ ord('G')
+_CG_MATCH = ord('C') | _CG_BIT
+
+# The same test on all eight bytes of a 64-bit word at once (SWAR): after setting
+# bit 2 and XOR'ing with `_CG_WORD`, matching bytes are zero, and each zero byte
+# is flagged by its top bit using `_LOW7_WORD`.
+_CG_BIT_WORD = np.uint64(0x0101010101010101 * _CG_BIT)
+_CG_WORD = np.uint64(0x0101010101010101 * _CG_MATCH)
+_LOW7_WORD = np.uint64(0x7F7F7F7F7F7F7F7F)
+_ONES_WORD = np.uint64(0x0101010101010101)
+
+# Below this chunk size the head and tail of each chunk dominate, and counting
+# byte by byte is faster than `_count_cg`.
+_SWAR_MIN_CHUNK = 32
+
+# Size in bytes of the tiles the Numba scan works through, small enough for each
+# tile to stay resident in L1 while its chunks are scored.
+_TILE_SIZE = 1 << 16
+
+# Sequences shorter than this are scored in-process, since splitting them across
+# worker processes would cost more than the scan itself.
+_MIN_BLOCK_SIZE = 1 << 20
+
+# On a free-threaded interpreter (Python 3.13+ built with `--disable-gil` and run
+# with the GIL off, e.g. `PYTHON_GIL=0`) worker threads scan the sequence in
+# parallel without copying it between processes.
+_GIL_DISABLED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+# Worker processes are started from a clean process rather than forked, since
+# forking after the Numba scan has started its worker threads can leave the
+# interpreter hanging at exit.
+_MP_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _min_score(threshold, length):
+    """
+    Returns the least number of C's and G's for which `length` characters are at
+    least `threshold` C's and G's, so spans can be tested against `threshold`
+    exactly without a division per span.
     """
-    
-    @property
-    def daemon(self):
-        return False
-    
-    @daemon.setter
-    def daemon(self, value):
-        pass
 
-class NoDaemonContext(type(multiprocessing.get_context())):
-    Process = NoDaemonProcess
+    if math.isinf(threshold):
+        return 0 if threshold < 0 else length + 1
+    # Clamp to the scores that are possible, so the result always fits in int64
+    return min(max(math.ceil(Fraction(threshold) * length), 0), length + 1)
 
-class NoDaemonPool(multiprocessing.pool.Pool):
+
+@dataclass(frozen=True, slots=True)
+class ScanOpts:
     """
-    Define a no-daemon pool (NoDaemonPool) class that spawns no-daemon processes 
-    which will also spawn their own subprocesses
+    Define the options (ScanOpts) used to scan a genomic sequence for CpG islands
     """
-    
-    def __init__(self, *args, **kwargs):
-        kwargs['context'] = NoDaemonContext()
-        super(NoDaemonPool, self).__init__(*args, **kwargs)
+
+    threads: int = 2
+    chunk: int = 4
+    threshold: float = 0.6
+    min_length: int = 8
+
+    # The least score for which a full chunk meets `threshold`
+    min_score: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'min_score', _min_score(self.threshold, self.chunk))
 
 
 class StringRepresentable:
@@ -51,139 +103,426 @@ class StringRepresentable:
         return str(self)
 
 
-class Chunk(StringRepresentable):
+class Island(StringRepresentable):
     """
-    Define Chunk class for parallel processing of the genome
+    Define a CpG island (Island) class that represents a CpG site in a genomic sequence, 
+    in the form of a substring with an index and length
     """
 
-    def __init__(self, seq, score, length):
-        self.seq = seq
-        self.score = score
+    def __init__(self, mv, index, length):
+        # Only a view of the whole sequence is kept, so the bases of the island
+        # are not copied until `seq` is accessed.
+        self._mv = mv
+        self.index = index
         self.length = length
 
-    def __str__(self):
-        return "({0}, {1}, {2})".format(self.seq, self.reduce(), self.length)
+    @property
+    def seq(self):
+        return bytes(self._mv[self.index:self.index+self.length])
 
-    def reduce(self):
-        """
-        Returns the ratio of CG presence in this chunk
-        """
-        
-        return self.score / self.length
+    def __str__(self):
+        # Decode straight from the view without materializing `seq` first
+        return "({0}, {1}, {2})".format(
+            str(self._mv[self.index:self.index+self.length], 'ascii'), self.index, self.length)
 
 
-class Island(StringRepresentable):
+class IslandList(StringRepresentable):
     """
-    Define a CpG island (Island) class that represents a CpG site in a genomic sequence, 
-    in the form of a substring with an index and length
+    Define a list of CpG islands (IslandList) class backed by contiguous arrays
+    of island indices and lengths, which only creates an Island for the items
+    that are actually accessed
     """
 
-    def __init__(self, seq, index, length):
+    def __init__(self, seq, indices, lengths):
         self.seq = seq
-        self.index = index
-        self.length = length
+        self.indices = indices
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return IslandList(self.seq, self.indices[i], self.lengths[i])
+        return Island(self.seq, int(self.indices[i]), int(self.lengths[i]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
 
     def __str__(self):
-        return "({0}, {1}, {2})".format(self.seq, self.index, self.length)
+        return "[{0}]".format(", ".join(str(island) for island in self))
 
 
-def find_islands(seq, opt = {}):
+def _as_view(seq):
     """
-    Finds CpG islands in a passed genomic sequence based on passed criteria.
+    Returns a `memoryview` of genomic sequence `seq`, encoding it first if it is
+    a `str`.
     """
 
-    # Parse options and/or use defaults
-    threads = 2
-    if 'threads' in opt:
-        threads = opt['threads']
-    if not 'chunk' in opt:
-        print('Missing chunk option')
-        return
-    if not 'threshold' in opt:
-        print('Missing threshold option')
-        return
-    if not 'min-length' in opt:
-        print('Missing min-length option')
-        return
+    if isinstance(seq, str):
+        # Non-ASCII characters become '?', one byte each, so they count as
+        # neither C nor G and the indices of the islands are unchanged.
+        seq = seq.encode('ascii', errors='replace')
+    return memoryview(seq)
 
-    chunk_size = opt['chunk']
-    threshold = opt['threshold']
-    min_length = opt['min-length']
 
-    print("Searching %ld character sequence for CpG islands using %ld threads, threshold of %.2f, min length of %ld, and slicing into chunks of size %ld or less" % (len(seq), threads, threshold, min_length, chunk_size))
-    
-    # Breaks sequence into chunks of equal size based on options
-    chunks = seek(seq, opt)
+def _cg_mask(arr):
+    """
+    Returns a boolean mask of the C's and G's in `uint8` encoded sequence `arr`.
+    """
 
-    print("Sliced %ld character sequence into %ld chunks" % (len(seq), len(chunks)))
+    return (arr | _CG_BIT) == _CG_MATCH
 
-    # Search for islands of `min_length` that meet the threshold from `chunks`
-    islands = []
-    offset = 0
-    n = -1
-    for i in range(len(chunks)):
-        chunk = chunks[i]
-        # If chunk does not meet threshold or is the last chunk, terminate the 
-        # current island (if there is one) and append it to the return array.
-        # Then reset `n` which is the offset of the next possible CpG island.
-        if chunk.reduce() < threshold or i == len(chunks) - 1:
-            # Only consider the island valid if it is greater in length than
-            # `min_length`.
-            if n >= 0 and offset - n >= min_length:
-                length = offset - n
-                island = Island(seq[n:n+length], n, offset - n)
-                islands.append(island)
-            n = -1
-        else:
-            # If `n < 0` then the index of a CpG island has not yet been set
-            # indicating the start of a possible new CpG island.
-            if n < 0:
-               n = offset
-        offset += chunk.length
 
-    print("Found %ld CpG islands matching the criteria" % len(islands))
+def _runs(passes):
+    """
+    Returns the `(first, stop)` indices of every run of True values in boolean
+    array `passes`, which start where it goes from False to True and stop where
+    it goes from True to False.
+    """
+
+    edges = np.diff(np.concatenate(([0], passes.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_islands(seq, opts = ScanOpts()):
+    """
+    Finds CpG islands in a passed genomic sequence based on the criteria in
+    `opts`.
+
+    `seq` is an ASCII encoded `bytes` (or `memoryview`) sequence. A `str` is also
+    accepted and encoded once up front.
+    """
+
+    mv = _as_view(seq)
+
+    threads = opts.threads
+    chunk_size = opts.chunk
+    threshold = opts.threshold
+    min_length = opts.min_length
+
+    logger.info("Searching %ld character sequence for CpG islands using %ld threads, threshold of %.2f, min length of %ld, and slicing into chunks of size %ld or less", len(seq), threads, threshold, min_length, chunk_size)
+
+    # Only the last chunk can be shorter than `chunk_size`
+    min_score = opts.min_score
+    min_tail_score = _min_score(threshold, len(mv) % chunk_size)
+
+    if _NUMBA_AVAILABLE:
+        # Score chunks and detect islands in a single fused pass, so only the
+        # `(index, length)` pairs of the islands found are ever materialized.
+        # The tiles of the pass are shared between `threads` Numba threads.
+        numba.set_num_threads(max(min(threads, numba.config.NUMBA_NUM_THREADS), 1))
+        spans = _scan_numba(
+            np.frombuffer(mv, dtype=np.uint8),
+            chunk_size, min_score, min_tail_score, min_length)
+        islands = IslandList(mv, spans[:, 0], spans[:, 1])
+        logger.info("Sliced %ld character sequence into %ld chunks", len(seq), -(-len(seq) // chunk_size))
+        logger.info("Found %ld CpG islands matching the criteria", len(islands))
+        return islands
+
+    # Otherwise score the sequence in chunks of equal size based on options
+    scores, lengths = seek(mv, opts)
+
+    logger.info("Sliced %ld character sequence into %ld chunks", len(seq), len(scores))
+
+    # Search for islands of `min_length` that meet the threshold from the chunk
+    # `scores` and `lengths`. A chunk passes when `score / length >= threshold`,
+    # tested exactly against the least passing score for its length over the
+    # whole array at once. The last chunk always terminates the current island
+    # (if there is one).
+    passes = scores >= np.where(lengths == chunk_size, min_score, min_tail_score)
+    if len(passes) > 0:
+        passes[-1] = False
+    offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+
+    # Islands are runs of passing chunks
+    first, stop = _runs(passes)
+    starts = offsets[first]
+    stops = offsets[stop]
+
+    # Only consider the island valid if it is at least `min_length` long.
+    valid = stops - starts >= min_length
+    islands = IslandList(mv, starts[valid], (stops - starts)[valid])
+
+    logger.info("Found %ld CpG islands matching the criteria", len(islands))
     return islands
 
 
-def seek(seq, opt = {}):
+def find_islands_sliding(seq, window = 200, gc_threshold = 0.5, min_length = 200):
     """
-    Subroutine for breaking genomic sequence into chunks to be processed in parallel.
+    Finds CpG islands in a passed genomic sequence using a sliding window of
+    `window` characters, rather than fixed chunks.
+
+    Islands are the spans covered by overlapping or adjacent windows that are
+    at least `gc_threshold` C's and G's, and that are at least `min_length` long.
     """
 
-    threads = 2
-    if 'threads' in opt:
-        threads = opt['threads']
-    if not 'chunk' in opt:
-        print('Missing chunk option')
-        return
+    if window <= 0:
+        raise ValueError("window must be a positive number of characters, got %d" % window)
+
+    mv = _as_view(seq)
+
+    logger.info("Searching %ld character sequence for CpG islands using a sliding window of %ld, threshold of %.2f, and min length of %ld", len(seq), window, gc_threshold, min_length)
 
-    chunk_size = opt['chunk']
+    if len(mv) < window:
+        logger.info("Found 0 CpG islands matching the criteria")
+        return IslandList(mv, np.empty(0, np.int64), np.empty(0, np.int64))
 
-    if len(seq) > chunk_size:
-        mid = math.floor(len(seq)/2)
-        with NoDaemonPool(threads) as pool:
+    # The C/G count of every window is the difference of two prefix sums, so
+    # all windows are scored in O(N) regardless of `window`.
+    arr = np.frombuffer(mv, dtype=np.uint8)
+    cum = np.concatenate(([0], np.cumsum(_cg_mask(arr), dtype=np.int64)))
+    window_gc = cum[window:] - cum[:-window]
 
-            chunks = []
-            # Process the chunks in parallel:
-            # Recursively calls `seek` on the head and tail halves of `seq`
-            r = pool.starmap(seek, [(seq[0:mid], opt), (seq[mid:len(seq)], opt)])
+    # A window passes when `window_gc / window >= gc_threshold`, tested exactly
+    # against the least passing score over the whole array at once.
+    passes = window_gc >= _min_score(gc_threshold, window)
 
-            # This is equivalent to serially calling `seek` like below:
-            # r = (seek(seq[0:mid], opt), seek(seq[mid:len(seq)], opt))
+    # A run of passing windows covers from the first of them to the end of the
+    # last. Runs less than `window` apart cover overlapping or adjacent spans,
+    # so join those spans across every such gap into a single island.
+    starts, stop = _runs(passes)
+    stops = stop - 1 + window
+    gaps = starts[1:] > stops[:-1]
+    starts = np.concatenate((starts[:1], starts[1:][gaps]))
+    stops = np.concatenate((stops[:-1][gaps], stops[-1:]))
 
-            # If the return object is two arrays of chunks, append their contents,
-            # separately so we don't end up with multidimensional arrays
-            if not type(r[0]) is Chunk:
-                chunks += r[0]
-                chunks += r[1]
-            else:
-                chunks += r
+    # Only consider the island valid if it is at least `min_length` long.
+    valid = stops - starts >= min_length
+    islands = IslandList(mv, starts[valid], (stops - starts)[valid])
 
-            return chunks
+    logger.info("Found %ld CpG islands matching the criteria", len(islands))
+    return islands
 
-    # TODO: is regex or count more performant than `count` method?
-    score = len(re.findall('[CG]', seq)) # seq.count('C') + seq.count('G')
-    return Chunk(seq, score, len(seq))
+
+def seek(seq, opts = ScanOpts()):
+    """
+    Subroutine for scoring an ASCII encoded genomic sequence (`bytes` or
+    `memoryview`) in chunks of `opts.chunk` characters.
+
+    Returns a `(scores, lengths)` pair of arrays with one entry per chunk, where
+    `scores` is the number of C's and G's in each chunk and `lengths` is the
+    length of each chunk. Every chunk is `opts.chunk` characters long except for the
+    last one, which holds whatever remains of the sequence.
+    """
+
+    threads = opts.threads
+    chunk_size = opts.chunk
+    data = _as_view(seq)
+
+    # Split the sequence into one block per worker, aligned to chunk boundaries
+    # so the chunks are the same as when scoring the sequence in one pass. The
+    # chunks are shared out evenly, so no block is more than one chunk longer
+    # than any other.
+    nchunks = -(-len(data) // chunk_size)
+    threads = max(min(threads, nchunks), 1)
+    if threads == 1 or len(data) // threads < _MIN_BLOCK_SIZE:
+        return _score_chunks(data, chunk_size)
+
+    bounds = np.minimum(np.arange(threads + 1) * nchunks // threads * chunk_size, len(data))
+    starts = bounds[:-1]
+    ends = bounds[1:]
+
+    if _GIL_DISABLED:
+        # Threads share `data`, so each one scores a zero-copy view of its block
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            r = list(executor.map(
+                _score_chunks,
+                [data[start:end] for start, end in zip(starts.tolist(), ends.tolist())],
+                [chunk_size] * len(starts)))
+    else:
+        # Copy the sequence into shared memory once, so each task only has to
+        # send the name of the segment and the bounds of its block to the workers.
+        shm = SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=threads,
+                    mp_context=multiprocessing.get_context(_MP_START_METHOD)) as executor:
+                # Process the blocks in parallel with a single, flat pool of workers
+                r = list(executor.map(
+                    _score_shared_block,
+                    [shm.name] * len(starts),
+                    starts.tolist(),
+                    ends.tolist(),
+                    [chunk_size] * len(starts)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return (
+        np.concatenate([scores for scores, _ in r]),
+        np.concatenate([lengths for _, lengths in r]))
+
+
+def _score_shared_block(name, start, end, chunk_size):
+    """
+    Scores the `[start, end)` block of a sequence held in the shared memory
+    segment `name` in chunks of `chunk_size` characters.
+    """
+
+    shm = SharedMemory(name=name)
+    try:
+        block = np.frombuffer(shm.buf, dtype=np.uint8, count=end - start, offset=start)
+        r = _score_chunks(block, chunk_size)
+        # Release the view before closing, since the segment cannot be closed
+        # while it is still exported.
+        del block
+        return r
+    finally:
+        shm.close()
+
+
+def _score_chunks(data, chunk_size):
+    """
+    Scores ASCII encoded sequence `data` (any buffer of bytes) in chunks of
+    `chunk_size` characters.
+    """
+
+    # Counting C's and G's is a single linear, memory-bound pass, so score the
+    # whole block at once with NumPy.
+    arr = np.frombuffer(data, dtype=np.uint8)
+    mask = _cg_mask(arr)
+
+    # Reduce every full chunk in one call, then handle the ragged tail (if any)
+    # with a final slice.
+    n = len(arr) // chunk_size
+    scores = mask[:n * chunk_size].reshape(n, chunk_size).sum(axis=1, dtype=np.int32)
+    lengths = np.full(n, chunk_size, dtype=np.int32)
+    if n * chunk_size < len(arr):
+        scores = np.append(scores, np.int32(mask[n * chunk_size:].sum()))
+        lengths = np.append(lengths, np.int32(len(arr) - n * chunk_size))
+
+    return scores, lengths
+
+
+def _count_cg(seq_u8, words, head, start, end):
+    """
+    Counts the C's and G's in `seq_u8[start:end]`, eight bytes at a time over
+    `words`, the aligned 64-bit view of `seq_u8` starting at byte `head`.
+    """
+
+    score = 0
+    j = start
+    # Count byte by byte up to the first word boundary
+    while j < end and (j < head or (j - head) & 7):
+        score += (seq_u8[j] | _CG_BIT) == _CG_MATCH
+        j += 1
+    # Count whole words without branching on the bytes they hold
+    while j + 8 <= end:
+        y = (words[(j - head) >> 3] | _CG_BIT_WORD) ^ _CG_WORD
+        zero = ~(((y & _LOW7_WORD) + _LOW7_WORD) | y | _LOW7_WORD)
+        # Sum the flags, one per matching byte, into the top byte
+        score += ((zero >> np.uint64(7)) * _ONES_WORD) >> np.uint64(56)
+        j += 8
+    # Count whatever is left of the range
+    while j < end:
+        score += (seq_u8[j] | _CG_BIT) == _CG_MATCH
+        j += 1
+    return score
+
+
+def _scan_tile(seq_u8, words, head, start, end, chunk_size, min_score, min_tail_score, min_length, out, k):
+    """
+    Fused chunk scoring and island detection over the `[start, end)` tile of a
+    `uint8` encoded sequence.
+
+    Islands that lie entirely inside the tile are written to `out` from row `k`.
+    Runs touching either edge of the tile may continue into its neighbours, so
+    they are returned instead as `(count, lead, trail)`: the number of islands
+    written, the length of the run starting at `start` (`end - start` if every
+    chunk passes), and the index of the run reaching `end` (-1 if there is none).
+    """
+
+    count = 0
+    lead = -1
+    n = -1
+    for offset in range(start, end, chunk_size):
+        stop = min(offset + chunk_size, len(seq_u8))
+        if chunk_size >= _SWAR_MIN_CHUNK:
+            score = _count_cg(seq_u8, words, head, offset, stop)
+        else:
+            score = 0
+            for j in range(offset, stop):
+                score += (seq_u8[j] | _CG_BIT) == _CG_MATCH
+        # Same as the fallback in `find_islands`: the last chunk always
+        # terminates the current island.
+        if score < (min_score if stop - offset == chunk_size else min_tail_score) or stop == len(seq_u8):
+            if lead < 0:
+                lead = offset - start
+            elif n >= 0 and offset - n >= min_length:
+                out[k + count, 0] = n
+                out[k + count, 1] = offset - n
+                count += 1
+            n = -1
+        elif n < 0 and lead >= 0:
+            n = offset
+    if lead < 0:
+        lead = end - start
+    return count, lead, n
+
+
+def _scan_numba(seq_u8, chunk_size, min_score, min_tail_score, min_length, tile_size=_TILE_SIZE):
+    """
+    Fused chunk scoring and island detection over a `uint8` encoded sequence.
+
+    Returns an `(islands, 2)` array of `(index, length)` pairs. A chunk meets the
+    threshold when its score is at least `min_score`, or `min_tail_score` for a
+    last chunk shorter than `chunk_size`, which avoids a division per chunk.
+
+    The sequence is scanned in tiles of about `tile_size` bytes, rounded down to
+    whole chunks.
+    """
+
+    # View the 8-byte aligned part of the sequence as words for `_count_cg`,
+    # starting `head` bytes into the sequence.
+    head = min((-seq_u8.ctypes.data) & 7, len(seq_u8))
+    words = seq_u8[head:head + (len(seq_u8) - head) // 8 * 8].view(np.uint64)
+
+    # Scan the sequence in tiles of whole chunks that fit in L1, in parallel.
+    # Every island is terminated by a chunk that is not part of it, so there can
+    # be no more than one island for every two chunks of a tile.
+    tile_chunks = max(tile_size // chunk_size, 1)
+    tile_size = tile_chunks * chunk_size
+    ntiles = (len(seq_u8) + tile_size - 1) // tile_size
+    rows = tile_chunks // 2 + 1
+    out = np.empty((ntiles * rows, 2), np.int64)
+    counts = np.empty(ntiles, np.int64)
+    leads = np.empty(ntiles, np.int64)
+    trails = np.empty(ntiles, np.int64)
+    for t in _prange(ntiles):
+        start = t * tile_size
+        counts[t], leads[t], trails[t] = _scan_tile(
+            seq_u8, words, head, start, min(start + tile_size, len(seq_u8)),
+            chunk_size, min_score, min_tail_score, min_length, out, t * rows)
+
+    # Join the runs that cross tile boundaries and gather the islands in order
+    islands = np.empty((counts.sum() + ntiles, 2), np.int64)
+    k = 0
+    n = -1
+    for t in range(ntiles):
+        start = t * tile_size
+        if n < 0:
+            n = start
+        # A tile where every chunk passes only extends the current run
+        if leads[t] == min(tile_size, len(seq_u8) - start):
+            continue
+        length = start + leads[t] - n
+        if length > 0 and length >= min_length:
+            islands[k, 0] = n
+            islands[k, 1] = length
+            k += 1
+        islands[k:k + counts[t]] = out[t * rows:t * rows + counts[t]]
+        k += counts[t]
+        n = trails[t]
+    return islands[:k]
+
+
+if _NUMBA_AVAILABLE:
+    _count_cg = numba.njit(cache=True, nogil=True)(_count_cg)
+    _scan_tile = numba.njit(cache=True, nogil=True)(_scan_tile)
+    _scan_numba = numba.njit(cache=True, nogil=True, parallel=True)(_scan_numba)
 
 
 def gen_seq(length):
@@ -191,62 +530,99 @@ def gen_seq(length):
     Generates a random genomic sequence of a specified length.
     """
     
-    return ''.join(random.choice(['C', 'G', 'A', 'T']) for i in range(length))
+    # Draw every base in one batched PRNG call and map them onto the alphabet
+    # with a single gather into a bytes buffer.
+    rng = np.random.default_rng()
+    arr = rng.integers(0, 4, size=length, dtype=np.uint8)
+    alphabet = np.frombuffer(b'CGAT', dtype=np.uint8)
+    return alphabet[arr].tobytes()
+
+def _positive_int(value):
+    """
+    Parses a command line argument that must be an integer greater than 0.
+    """
 
-if __name__ == '__main__':
+    try:
+        n = int(value)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        raise argparse.ArgumentTypeError("%r is not a positive integer" % value)
+    return n
 
-    args = []
-    threads = 2
-    chunk = 4
-    threshold = 0.6
-    min_length = 8
-    xnsize = 1024
-    seq = ''
-
-    i = 0
-    argv = sys.argv[1:]
-
-    # Parse out command line arguments into options
-    while len(argv) > 0:
-        arg = argv.pop(0)
-        if arg == "-h" or arg == "--help":
-            print(
-                "usage: ./scan.py [-t <threads>] [-th <threshold>] [-c <chunk-size>] [-m <min-length>] [-n <random-sequence-length>] [genomic-sequence]"
-            )
-            exit()
-        elif arg == "-t" or arg == "--threads":
-            threads = int(argv.pop(0))
-        elif arg == '-c' or arg == '--chunk':
-            chunk = int(argv.pop(0))
-        elif arg == '-th' or arg == '--threshold':
-            threshold = float(argv.pop(0))
-        elif arg == '-m' or arg == '--min-length':
-            min_length = int(argv.pop(0))
-        elif arg == '-n':
-            xnsize = int(argv.pop(0))
-        else:
-            args.append(arg)
 
-    if len(args) > 0:
-        seq = args[0]
+def _non_negative_int(value):
+    """
+    Parses a command line argument that must be an integer of at least 0.
+    """
+
+    try:
+        n = int(value)
+    except ValueError:
+        n = -1
+    if n < 0:
+        raise argparse.ArgumentTypeError("%r is not a non-negative integer" % value)
+    return n
+
+
+def _finite_float(value):
+    """
+    Parses a command line argument that must be a finite number.
+    """
+
+    try:
+        x = float(value)
+    except ValueError:
+        x = math.nan
+    if not math.isfinite(x):
+        raise argparse.ArgumentTypeError("%r is not a finite number" % value)
+    return x
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
+    parser = argparse.ArgumentParser(
+        description="Identifies CpG islands in a genomic sequence string.")
+    parser.add_argument('-t', '--threads', type=_positive_int, default=2,
+        help="Number of threads to use. Default is 2.")
+    parser.add_argument('-th', '--threshold', type=_finite_float, default=0.6,
+        help="Threshold to consider a chunk part of a CpG island. Default is 0.60, or 60%% C's and G's.")
+    parser.add_argument('-c', '--chunk', type=_positive_int, default=4,
+        help="Chunk size to use when slicing sequence. Default is 4.")
+    parser.add_argument('-m', '--min-length', type=int, default=8,
+        help="Min length of a CpG island. Default is 8 characters.")
+    parser.add_argument('-w', '--window', type=_non_negative_int, default=0,
+        help="Scan with a sliding window of this many characters instead of fixed chunks. Default is 0 (use chunks).")
+    parser.add_argument('-n', dest='xnsize', metavar='RANDOM_SEQUENCE_LENGTH', type=_positive_int, default=1024,
+        help="Length of random genomic sequence to test if not providing a sequence argument. Default is 1024.")
+    parser.add_argument('seq', nargs='?', default='',
+        help="Genomic sequence to scan.")
+    args = parser.parse_args()
+
+    seq = _as_view(args.seq)
 
     if len(seq) == 0:
         start = timeit.default_timer()
-        seq = gen_seq(xnsize)
+        seq = gen_seq(args.xnsize)
         stop = timeit.default_timer()
-        print("Took %.2f second(s) to generate %ld character sequence" % (stop - start, len(seq)))
+        logger.info("Took %.2f second(s) to generate %ld character sequence", stop - start, len(seq))
     # Record start time
     start = timeit.default_timer()
     # Find islands in seq based on options passed by command line
-    islands = find_islands(
-        seq,
-        { 
-            'threads': threads,
-            'chunk': chunk,
-            'threshold': threshold,
-            'min-length': min_length,
-        })
+    if args.window > 0:
+        islands = find_islands_sliding(seq, args.window, args.threshold, args.min_length)
+    else:
+        islands = find_islands(
+            seq,
+            ScanOpts(
+                threads=args.threads,
+                chunk=args.chunk,
+                threshold=args.threshold,
+                min_length=args.min_length,
+            ))
     # Record stop time for debug purposes
     stop = timeit.default_timer()
-    print("Took %.2f second(s) to find %ld CpG islands in %ld character sequence" % (stop - start, len(islands), len(seq)))
+    logger.info("Took %.2f second(s) to find %ld CpG islands in %ld character sequence", stop - start, len(islands), len(seq))
     print(islands)
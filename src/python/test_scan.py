@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import scan
+
+
+def spans(islands):
+    """
+    Returns the `(index, length)` pairs of an IslandList
+    """
+
+    return [(island.index, island.length) for island in islands]
+
+
+def random_seq(rng, length):
+    """
+    Generates a random sequence of a specified length that is rich in C's and
+    G's, with some bytes that are neither, starting at a random offset into its
+    buffer so the scan also sees sequences that are not 8-byte aligned
+    """
+
+    offset = rng.randint(0, 9)
+    raw = bytes(rng.choice(b'CGCGCGATN') for i in range(length + offset))
+    return memoryview(raw)[offset:]
+
+
+class ScanTest(unittest.TestCase):
+    """
+    Checks the Numba scan against the NumPy fallback of `find_islands`
+    """
+
+    def fallback(self, seq, opts):
+        with mock.patch.object(scan, '_NUMBA_AVAILABLE', False):
+            return spans(scan.find_islands(seq, opts))
+
+    def test_scan_numba_matches_fallback_across_tiles(self):
+        # Tiles this small put most islands across one or more tile boundaries,
+        # which exercises the join in `_scan_numba`.
+        rng = random.Random(13)
+        for i in range(500):
+            seq = random_seq(rng, rng.randint(0, 600))
+            opts = scan.ScanOpts(
+                chunk=rng.choice([1, 2, 3, 4, 5, 8, 13, 32, 40, 64]),
+                threshold=rng.choice([0.3, 0.5, 0.6, 0.75]),
+                min_length=rng.randint(0, 60))
+            expected = self.fallback(seq, opts)
+            for tile_size in (1, opts.chunk, 3 * opts.chunk + 1, 37, scan._TILE_SIZE):
+                r = scan._scan_numba(
+                    np.frombuffer(seq, dtype=np.uint8),
+                    opts.chunk,
+                    opts.min_score,
+                    scan._min_score(opts.threshold, len(seq) % opts.chunk),
+                    opts.min_length,
+                    tile_size)
+                self.assertEqual([(int(n), int(length)) for n, length in r], expected,
+                    (bytes(seq), opts, tile_size))
+
+    def test_find_islands_matches_fallback(self):
+        rng = random.Random(9)
+        for i in range(100):
+            seq = random_seq(rng, rng.randint(0, 5000))
+            opts = scan.ScanOpts(
+                chunk=rng.choice([4, 9, 32, 33, 200]),
+                threshold=rng.choice([0.3, 0.4, 0.6]),
+                min_length=rng.randint(1, 100))
+            self.assertEqual(spans(scan.find_islands(seq, opts)), self.fallback(seq, opts))
+
+    def test_threshold_is_exact(self):
+        seq = b'CGCAACGCAACGCAAAAAAA'
+        for use_numba in sorted({False, scan._NUMBA_AVAILABLE}):
+            with mock.patch.object(scan, '_NUMBA_AVAILABLE', use_numba):
+                self.assertEqual(spans(scan.find_islands(seq, scan.ScanOpts(chunk=5, threshold=0.6001, min_length=5))), [])
+                self.assertEqual(spans(scan.find_islands(seq, scan.ScanOpts(chunk=5, threshold=0.6, min_length=5))), [(0, 15)])
+
+
+if __name__ == '__main__':
+    unittest.main()